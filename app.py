@@ -1,110 +1,288 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
 import requests
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import os
-import json
 import re
+import base64
+import time
+import math
+import hashlib
+from bisect import bisect_right
+from functools import lru_cache
 from datetime import date
-from typing import Optional, Dict, List, Any
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Mapping
+from types import MappingProxyType
+from concurrent.futures import Future, ThreadPoolExecutor
 import threading
+import itertools
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import atexit
+from cachetools import TTLCache
+from jinja2 import Environment
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for API access
 
+# Log records are put on an in-memory queue by the calling thread and written to
+# stderr by a single listener thread, so request and background threads never
+# wait on the stream. The queue handler only merges the message arguments
+# (default formatter); the listener's handler applies the actual format.
+_log_queue = queue.SimpleQueue()
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter())
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+    handlers=[_log_queue_handler]
+)
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Flush queued records on shutdown
+logger = logging.getLogger(__name__)
+
 # Configuration - can be set via environment variable or defaults
 BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8080')
 DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY', '')
 DEEPSEEK_API_URL = os.getenv('DEEPSEEK_API_URL', 'https://api.deepseek.com/v1/chat/completions')
 ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', '')
+# Upper bound on Deepseek requests in flight at once (per process), to stay within rate limits
+DEEPSEEK_MAX_CONCURRENCY = int(os.getenv('DEEPSEEK_MAX_CONCURRENCY', 16))
+# Submit wellbeing and guidance results in one POST /student-mentor/{studentId}/results
+# call instead of separate /wellbeing and /guidance calls (requires backend support)
+USE_COMBINED_RESULTS = os.getenv('USE_COMBINED_RESULTS', 'False').lower() == 'true'
+
+# Deepseek request parts that don't change between calls
+_DEEPSEEK_HEADERS = {
+    'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
+    'Content-Type': 'application/json'
+} if DEEPSEEK_API_KEY else None
+_DEEPSEEK_PAYLOAD_BASE = {'model': 'deepseek-chat'}
+
+# Caches of successful Deepseek results, keyed by a digest of the prompt sent.
+# Fallback values are never cached, so a failed call is retried next time.
+_complaints_score_cache = TTLCache(maxsize=512, ttl=3600)
+_habits_cache = TTLCache(maxsize=512, ttl=3600)
+_gist_cache = TTLCache(maxsize=4096, ttl=3600)
+_deepseek_cache_lock = threading.Lock()
+
+# Short-lived cache of successful GET /student/info responses, keyed by student id
+_student_info_cache = TTLCache(maxsize=8192, ttl=15)
+_student_info_cache_lock = threading.Lock()
+# Backend fetches in flight, keyed by student id: concurrent callers for one student
+# wait on the same Future and all get its (student_info, error, status_code)
+_student_fetches: Dict[int, Future] = {}
+
+# Students with background processing in flight: id -> time.monotonic() it was claimed.
+# Repeat requests within INFLIGHT_TTL seconds piggyback on the running tasks; the TTL
+# keeps an id from being stuck if its tasks never report back.
+_inflight_students: Dict[int, float] = {}
+_inflight_lock = threading.Lock()
+INFLIGHT_TTL = 60
+
+# Slots for in-flight Deepseek requests, shared by every thread that calls the API
+_deepseek_slots = threading.BoundedSemaphore(DEEPSEEK_MAX_CONCURRENCY)
+
+# Thread pool for async background tasks (I/O-bound, so sized well beyond CPU count)
+executor = ThreadPoolExecutor(max_workers=32)
+
+# Pool for the concurrent student info fetches of a batch request (at most
+# this many backend GETs in flight across all batch requests)
+batch_fetch_executor = ThreadPoolExecutor(max_workers=32)
+BATCH_MAX_STUDENTS = 500
+
+# Separate pool for Deepseek calls made from inside background tasks, so a task
+# waiting on a Deepseek future never blocks a worker the future itself needs
+deepseek_executor = ThreadPoolExecutor(max_workers=32)
+
+class _BackendRetry(Retry):
+    """
+    Retry policy for the Spring Boot backend: a POST answered with 500/504 may
+    already have been processed, so only 502/503 (request never reached the
+    application) are retried for POSTs, to avoid creating duplicate records.
+    """
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method == 'POST' and status_code in (500, 504):
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+# Shared HTTP session so connections (and TLS handshakes) are reused across calls.
+# Connection errors and transient 5xx responses are retried inside urllib3 with
+# jittered exponential backoff; after the last attempt the 5xx response is returned.
+# Read errors (timeouts after the request was sent) are never retried: the server
+# may still be processing it, and a retry would multiply the caller's timeout.
+SESSION = requests.Session()
+_retry_settings = dict(
+    total=3,
+    read=0,
+    backoff_factor=0.3,
+    backoff_jitter=0.1,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'POST']),
+    raise_on_status=False
+)
+_retry = Retry(**_retry_settings)
+_backend_retry = _BackendRetry(**_retry_settings)
+# pool_maxsize covers the background and Deepseek pools (32 + 32 threads) plus request
+# threads talking to the same host, so busy periods don't discard kept-alive connections
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=64, max_retries=_retry)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+# Longest matching prefix wins, so backend calls use the backend retry policy
+SESSION.mount(BASE_URL, HTTPAdapter(pool_connections=10, pool_maxsize=64, max_retries=_backend_retry))
+
+# JWT token cache: token, when to log in again (epoch seconds, shortly before
+# the JWT 'exp' claim) and the read-only request headers carrying it
+_jwt = {'token': None, 'refresh_at': 0, 'headers': None}
+_token_lock = threading.Lock()
+# Held while logging in so concurrent cache misses trigger a single login
+_refresh_lock = threading.Lock()
 
-# Thread pool for async background tasks
-executor = ThreadPoolExecutor(max_workers=4)
+# Refresh the token this many seconds before it actually expires, capped at half
+# the lifetime it had when issued (short-lived tokens, clock skew)
+JWT_REFRESH_MARGIN = 60
+# Lifetime assumed for tokens without a readable 'exp' claim
+JWT_DEFAULT_TTL = int(os.getenv('JWT_DEFAULT_TTL', 3600))
+
+# Headers for backend requests when no token is available
+_BASE_HEADERS = MappingProxyType({'Content-Type': 'application/json'})
+
+
+def _jwt_is_fresh() -> bool:
+    """Whether the cached token exists and is not about to expire. Caller holds _token_lock."""
+    return bool(_jwt['token']) and time.time() < _jwt['refresh_at']
+
+
+def _cached_jwt_token() -> Optional[str]:
+    """Return the cached token if it is not about to expire."""
+    with _token_lock:
+        if _jwt_is_fresh():
+            return _jwt['token']
+    return None
 
-# JWT token cache
-_jwt_token = None
-_token_lock = threading.Lock()
+
+def _bearer_headers(token: str) -> Mapping[str, str]:
+    """Read-only request headers authenticating with the given token."""
+    return MappingProxyType({'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'})
+
+
+def _decode_jwt_exp(token: str) -> float:
+    """
+    Read the 'exp' claim from a JWT payload (no signature verification).
+    If the claim is missing or the token can't be decoded, the token is
+    assumed to be valid for JWT_DEFAULT_TTL seconds from now.
+    """
+    try:
+        payload = token.split('.')[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + JWT_DEFAULT_TTL
 
 
 def get_jwt_token() -> Optional[str]:
     """
     Get JWT token by authenticating with the Spring Boot backend.
-    Caches the token for reuse.
+    Caches the token until shortly before it expires.
     
     POST /auth/login
     Body: { "username": "admin", "password": "<ADMIN_PASSWORD>" }
     """
-    global _jwt_token
-    
-    # Return cached token if available
-    with _token_lock:
-        if _jwt_token:
-            return _jwt_token
+    # Return cached token if still valid
+    token = _cached_jwt_token()
+    if token:
+        return token
     
     if not ADMIN_PASSWORD:
-        print("Warning: ADMIN_PASSWORD environment variable not set. Authentication will fail.")
+        logger.warning("ADMIN_PASSWORD environment variable not set. Authentication will fail.")
         return None
     
-    try:
-        url = f"{BASE_URL}/auth/login"
-        payload = {
-            "username": "admin",
-            "password": ADMIN_PASSWORD
-        }
-        
-        response = requests.post(
-            url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
+    with _refresh_lock:
+        # Another thread may have logged in while we waited for the lock
+        token = _cached_jwt_token()
+        if token:
+            return token
         
-        if response.status_code == 200:
-            data = response.json()
-            # Token might be in 'token', 'accessToken', 'jwt', or directly in response
-            token = data.get('token') or data.get('accessToken') or data.get('jwt') or data.get('access_token')
+        try:
+            url = f"{BASE_URL}/auth/login"
+            payload = {
+                "username": "admin",
+                "password": ADMIN_PASSWORD
+            }
+            
+            response = SESSION.post(
+                url,
+                data=orjson.dumps(payload),
+                headers={'Content-Type': 'application/json'},
+                timeout=10
+            )
             
-            if token:
-                with _token_lock:
-                    _jwt_token = token
-                print("[Auth] Successfully obtained JWT token")
-                return token
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                # Token might be in 'token', 'accessToken', 'jwt', or directly in response
+                token = data.get('token') or data.get('accessToken') or data.get('jwt') or data.get('access_token')
+                
+                if token:
+                    exp = _decode_jwt_exp(token)
+                    lifetime = max(0.0, exp - time.time())
+                    refresh_at = exp - min(JWT_REFRESH_MARGIN, lifetime / 2)
+                    headers = _bearer_headers(token)
+                    with _token_lock:
+                        _jwt['token'] = token
+                        _jwt['refresh_at'] = refresh_at
+                        _jwt['headers'] = headers
+                    logger.info("[Auth] Successfully obtained JWT token")
+                    return token
+                else:
+                    logger.warning("Login successful but no token found in response: %s", data)
+                    return None
             else:
-                print(f"Warning: Login successful but no token found in response: {data}")
+                logger.warning("Login failed. Status: %s, Response: %s", response.status_code, response.text)
                 return None
-        else:
-            print(f"Warning: Login failed. Status: {response.status_code}, Response: {response.text}")
+                
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+            logger.warning("Error during login: %s", e)
             return None
-            
-    except requests.exceptions.RequestException as e:
-        print(f"Warning: Error during login: {str(e)}")
-        return None
 
 
-def get_auth_headers() -> Dict[str, str]:
+def get_auth_headers() -> Mapping[str, str]:
     """
     Get headers with JWT Bearer token for authenticated requests.
+    The returned mapping is shared and read-only; copy it before adding headers.
     """
-    headers = {'Content-Type': 'application/json'}
+    with _token_lock:
+        if _jwt_is_fresh():
+            return _jwt['headers']
     
     token = get_jwt_token()
-    if token:
-        headers['Authorization'] = f'Bearer {token}'
+    if not token:
+        return _BASE_HEADERS
     
-    return headers
+    with _token_lock:
+        if _jwt['token'] == token:
+            return _jwt['headers']
+    # Token was cleared or replaced since get_jwt_token returned it
+    return _bearer_headers(token)
 
 
 def clear_jwt_token():
     """
     Clear cached JWT token (call this if token expires).
     """
-    global _jwt_token
     with _token_lock:
-        _jwt_token = None
-    print("[Auth] JWT token cleared")
+        _jwt['token'] = None
+        _jwt['refresh_at'] = 0
+        _jwt['headers'] = None
+    logger.info("[Auth] JWT token cleared")
 
 
-def get_student_info(student_id):
+def get_student_info(student_id, fresh: bool = False):
     """
     Fetch student information from the API.
     
@@ -118,20 +296,61 @@ def get_student_info(student_id):
     - oceanScore: OceanScore (Big5 personality test with detailed facets)
     - unresolvedComplaints: List[ComplaintResponse] (SUBMITTED or IN_PROGRESS status)
     - currentWeekPulse: WeeklyPulse (current week's pulse data)
+    
+    Successful responses are cached for a few seconds. Concurrent calls for the
+    same student share one backend request and its outcome, including errors
+    (which are not cached). With fresh=True the cached copy is ignored, but a
+    fetch already in flight (it completes after this call arrived) is shared.
+    """
+    with _student_info_cache_lock:
+        student_info = None if fresh else _student_info_cache.get(student_id)
+        if student_info is None:
+            fetch = _student_fetches.get(student_id)
+            is_fetcher = fetch is None
+            if is_fetcher:
+                fetch = _student_fetches[student_id] = Future()
+    if student_info is not None:
+        return student_info, None, 200
+    
+    if not is_fetcher:
+        return fetch.result()
+    
+    try:
+        result = _fetch_student_info(student_id)
+    except Exception as e:
+        with _student_info_cache_lock:
+            if _student_fetches.get(student_id) is fetch:
+                del _student_fetches[student_id]
+        fetch.set_exception(e)
+        raise
+    
+    with _student_info_cache_lock:
+        if result[0] is not None:
+            _student_info_cache[student_id] = result[0]
+        if _student_fetches.get(student_id) is fetch:
+            del _student_fetches[student_id]
+    fetch.set_result(result)
+    return result
+
+
+def _fetch_student_info(student_id):
+    """
+    GET /student/info/{studentId} from the backend, retrying once with a fresh
+    token on 401/403. Returns (student_info, error, status_code).
     """
     try:
         url = f"{BASE_URL}/student/info/{student_id}"
         headers = get_auth_headers()
-        response = requests.get(url, headers=headers, timeout=10)
+        response = SESSION.get(url, headers=headers, timeout=10)
         
         # If unauthorized, clear token and retry once
         if response.status_code == 401 or response.status_code == 403:
             clear_jwt_token()
             headers = get_auth_headers()
-            response = requests.get(url, headers=headers, timeout=10)
+            response = SESSION.get(url, headers=headers, timeout=10)
         
         if response.status_code == 200:
-            return response.json(), None, 200
+            return orjson.loads(response.content), None, 200
         elif response.status_code == 400:
             return None, "Invalid student ID", 400
         elif response.status_code == 404:
@@ -140,26 +359,65 @@ def get_student_info(student_id):
             return None, "Authentication failed. Check ADMIN_PASSWORD environment variable.", response.status_code
         else:
             return None, f"Error: {response.status_code} - {response.text}", response.status_code
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         return None, f"Connection error: {str(e)}", 500
 
 
+def _upto(limit: float) -> float:
+    """Breakpoint for an inclusive upper bound (value <= limit) when used with bisect_right."""
+    return math.nextafter(limit, math.inf)
+
+
+# Threshold tables for the habit scorers, built once at import time.
+# Each scorer returns SCORES[bisect_right(BREAKS, value)], so len(SCORES) == len(BREAKS) + 1.
+_SLEEP_QUALITY_BREAKS = (6, 8)
+_SLEEP_QUALITY_SCORES = (2.0, 1.0, 0.0)  # Poor, good, excellent
+
+_SLEEP_HOURS_BREAKS = (6, 7, _upto(9), _upto(10))
+_SLEEP_HOURS_SCORES = (2.0, 1.0, 0.0, 1.0, 2.0)  # Optimal 7-9, acceptable 6-7 / 9-10
+
+_BEDTIME_BREAKS = (1, 21, 22, _upto(23))
+_BEDTIME_SCORES = (1.0, 2.0, 1.0, 0.0, 2.0)  # Optimal 22-23, acceptable 21-22 / 0-1
+
+_WAKE_TIME_BREAKS = (5, 6, _upto(7), _upto(8))
+_WAKE_TIME_SCORES = (2.0, 1.0, 0.0, 1.0, 2.0)  # Optimal 6-7, acceptable 5-6 / 7-8
+
+_WATER_INTAKE_BREAKS = (1.5, 2, _upto(3), _upto(4))
+_WATER_INTAKE_SCORES = (2.0, 1.0, 0.0, 1.0, 2.0)  # Optimal 2-3L, acceptable 1.5-2 / 3-4
+
+_JUNK_FOOD_BREAKS = (_upto(1), _upto(3))
+_JUNK_FOOD_SCORES = (0.0, 1.0, 2.0)  # Excellent, acceptable, high frequency
+
+_MEALS_BREAKS = (2, 2.5, _upto(3.5), _upto(4))
+_MEALS_SCORES = (2.0, 1.0, 0.0, 1.0, 2.0)  # Optimal 2.5-3.5, acceptable 2-2.5 / 3.5-4
+
+_EXERCISE_HOURS_BREAKS = (0.5, 1, _upto(2), _upto(3))
+_EXERCISE_HOURS_SCORES = (2.0, 1.0, 0.0, 1.0, 2.0)  # Optimal 1-2, acceptable 0.5-1 / 2-3
+
+# Assuming monthly total, target of ~10000 for 30 days
+_CALORIES_BREAKS = (7000, 10000)
+_CALORIES_SCORES = (2.0, 1.0, 0.0)  # Low, good, excellent
+
+_SCREEN_TIME_BREAKS = (_upto(2), _upto(4))
+_SCREEN_TIME_SCORES = (0.0, 1.0, 2.0)  # Excellent, acceptable, high
+
+_PRE_SLEEP_SCREEN_BREAKS = (_upto(0.5), _upto(1))
+_PRE_SLEEP_SCREEN_SCORES = (0.0, 1.0, 2.0)  # Excellent, acceptable, high
+
+_MEDIA_DURATION_BREAKS = (_upto(1), _upto(2))
+_MEDIA_DURATION_SCORES = (0.0, 1.0, 2.0)  # Excellent, acceptable, high
+
+_EDUCATIONAL_CONTENT_BREAKS = (10, 20)
+_EDUCATIONAL_CONTENT_SCORES = (2.0, 1.0, 0.0)  # Low, good, excellent
+
+
 def score_sleep_quality(quality: Optional[float]) -> float:
     """Score sleep quality (0-2). Higher quality = lower stress = lower score."""
     if quality is None:
         return 1.0  # Default middle score if missing
     
-    # Assuming quality is 0-10 scale
-    # Clamp to valid range
-    quality = max(0.0, min(10.0, quality))
-    
-    # Lower quality = higher stress = higher score
-    if quality >= 8:
-        return 0.0  # Excellent sleep
-    elif quality >= 6:
-        return 1.0  # Good sleep
-    else:
-        return 2.0  # Poor sleep
+    # Assuming quality is 0-10 scale; out-of-range values fall into the end buckets
+    return _SLEEP_QUALITY_SCORES[bisect_right(_SLEEP_QUALITY_BREAKS, quality)]
 
 
 def score_sleep_hours(hours: Optional[float]) -> float:
@@ -167,12 +425,7 @@ def score_sleep_hours(hours: Optional[float]) -> float:
     if hours is None:
         return 1.0
     
-    if 7 <= hours <= 9:
-        return 0.0  # Optimal
-    elif 6 <= hours < 7 or 9 < hours <= 10:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # Poor
+    return _SLEEP_HOURS_SCORES[bisect_right(_SLEEP_HOURS_BREAKS, hours)]
 
 
 def score_bedtime(bedtime: Optional[float]) -> float:
@@ -182,14 +435,7 @@ def score_bedtime(bedtime: Optional[float]) -> float:
     
     # Assuming bedtime is in 24-hour format (0-23)
     # Normalize to 0-23 range using modulo (handles both negative and >= 24)
-    bedtime = bedtime % 24
-    
-    if 22 <= bedtime <= 23:
-        return 0.0  # Optimal
-    elif 21 <= bedtime < 22 or 0 <= bedtime < 1:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # Late bedtime
+    return _BEDTIME_SCORES[bisect_right(_BEDTIME_BREAKS, bedtime % 24)]
 
 
 def score_wake_time(wake_time: Optional[float]) -> float:
@@ -199,14 +445,7 @@ def score_wake_time(wake_time: Optional[float]) -> float:
     
     # Assuming wake time is in 24-hour format (0-23)
     # Normalize to 0-23 range using modulo (handles both negative and >= 24)
-    wake_time = wake_time % 24
-    
-    if 6 <= wake_time <= 7:
-        return 0.0  # Optimal
-    elif 5 <= wake_time < 6 or 7 < wake_time <= 8:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # Irregular
+    return _WAKE_TIME_SCORES[bisect_right(_WAKE_TIME_BREAKS, wake_time % 24)]
 
 
 def score_water_intake(liters: Optional[float]) -> float:
@@ -214,12 +453,7 @@ def score_water_intake(liters: Optional[float]) -> float:
     if liters is None:
         return 1.0
     
-    if 2 <= liters <= 3:
-        return 0.0  # Optimal
-    elif 1.5 <= liters < 2 or 3 < liters <= 4:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # Poor
+    return _WATER_INTAKE_SCORES[bisect_right(_WATER_INTAKE_BREAKS, liters)]
 
 
 def score_junk_food_frequency(frequency: Optional[float]) -> float:
@@ -228,12 +462,7 @@ def score_junk_food_frequency(frequency: Optional[float]) -> float:
         return 1.0
     
     # Assuming frequency is times per week
-    if frequency <= 1:
-        return 0.0  # Excellent
-    elif frequency <= 3:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # High frequency
+    return _JUNK_FOOD_SCORES[bisect_right(_JUNK_FOOD_BREAKS, frequency)]
 
 
 def score_meals_consumed(meals: Optional[float]) -> float:
@@ -241,12 +470,7 @@ def score_meals_consumed(meals: Optional[float]) -> float:
     if meals is None:
         return 1.0
     
-    if 2.5 <= meals <= 3.5:
-        return 0.0  # Optimal
-    elif 2 <= meals < 2.5 or 3.5 < meals <= 4:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # Irregular
+    return _MEALS_SCORES[bisect_right(_MEALS_BREAKS, meals)]
 
 
 def score_exercise_hours(hours: Optional[float]) -> float:
@@ -254,12 +478,7 @@ def score_exercise_hours(hours: Optional[float]) -> float:
     if hours is None:
         return 1.0
     
-    if 1 <= hours <= 2:
-        return 0.0  # Optimal
-    elif 0.5 <= hours < 1 or 2 < hours <= 3:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # Too little or too much
+    return _EXERCISE_HOURS_SCORES[bisect_right(_EXERCISE_HOURS_BREAKS, hours)]
 
 
 def score_calories_burned(calories: Optional[int]) -> float:
@@ -267,17 +486,14 @@ def score_calories_burned(calories: Optional[int]) -> float:
     if calories is None:
         return 1.0
     
-    # Ensure non-negative
-    calories = max(0, calories)
-    
-    # Assuming monthly total
-    monthly_target = 10000  # Approximate target for 30 days
-    if calories >= monthly_target:
-        return 0.0  # Excellent
-    elif calories >= monthly_target * 0.7:
-        return 1.0  # Good
-    else:
-        return 2.0  # Low
+    return _CALORIES_SCORES[bisect_right(_CALORIES_BREAKS, calories)]
+
+
+# Keyword patterns for the text habit fields, matched case-insensitively anywhere in the value
+_HIGH_INTENSITY_EXERCISE_RE = re.compile(r'running|cycling|swimming|hiit|crossfit', re.IGNORECASE)
+_MODERATE_EXERCISE_RE = re.compile(r'walking|yoga|pilates|dancing', re.IGNORECASE)
+_EDUCATIONAL_PLATFORM_RE = re.compile(r'khan academy|coursera|edx|udemy|youtube education', re.IGNORECASE)
+_NEUTRAL_PLATFORM_RE = re.compile(r'youtube|netflix|spotify', re.IGNORECASE)
 
 
 def score_exercise_type(exercise_type: Optional[str]) -> float:
@@ -285,13 +501,9 @@ def score_exercise_type(exercise_type: Optional[str]) -> float:
     if exercise_type is None:
         return 1.0
     
-    exercise_type_lower = exercise_type.lower()
-    high_intensity = ['running', 'cycling', 'swimming', 'hiit', 'crossfit']
-    moderate = ['walking', 'yoga', 'pilates', 'dancing']
-    
-    if any(term in exercise_type_lower for term in high_intensity):
+    if _HIGH_INTENSITY_EXERCISE_RE.search(exercise_type):
         return 0.0  # High intensity
-    elif any(term in exercise_type_lower for term in moderate):
+    elif _MODERATE_EXERCISE_RE.search(exercise_type):
         return 1.0  # Moderate
     else:
         return 2.0  # Low intensity or unknown
@@ -302,12 +514,7 @@ def score_screen_time_hours(hours: Optional[float]) -> float:
     if hours is None:
         return 1.0
     
-    if hours <= 2:
-        return 0.0  # Excellent
-    elif hours <= 4:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # High screen time
+    return _SCREEN_TIME_SCORES[bisect_right(_SCREEN_TIME_BREAKS, hours)]
 
 
 def score_pre_sleep_screen_time(hours: Optional[float]) -> float:
@@ -315,12 +522,7 @@ def score_pre_sleep_screen_time(hours: Optional[float]) -> float:
     if hours is None:
         return 1.0
     
-    if hours <= 0.5:
-        return 0.0  # Excellent
-    elif hours <= 1:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # High pre-sleep screen time
+    return _PRE_SLEEP_SCREEN_SCORES[bisect_right(_PRE_SLEEP_SCREEN_BREAKS, hours)]
 
 
 def score_media_duration(hours: Optional[float]) -> float:
@@ -328,12 +530,7 @@ def score_media_duration(hours: Optional[float]) -> float:
     if hours is None:
         return 1.0
     
-    if hours <= 1:
-        return 0.0  # Excellent
-    elif hours <= 2:
-        return 1.0  # Acceptable
-    else:
-        return 2.0  # High media consumption
+    return _MEDIA_DURATION_SCORES[bisect_right(_MEDIA_DURATION_BREAKS, hours)]
 
 
 def score_educational_content_count(count: Optional[int]) -> float:
@@ -341,12 +538,7 @@ def score_educational_content_count(count: Optional[int]) -> float:
     if count is None:
         return 1.0
     
-    if count >= 20:
-        return 0.0  # Excellent
-    elif count >= 10:
-        return 1.0  # Good
-    else:
-        return 2.0  # Low educational content
+    return _EDUCATIONAL_CONTENT_SCORES[bisect_right(_EDUCATIONAL_CONTENT_BREAKS, count)]
 
 
 def score_platform(platform: Optional[str]) -> float:
@@ -354,18 +546,39 @@ def score_platform(platform: Optional[str]) -> float:
     if platform is None:
         return 1.0
     
-    platform_lower = platform.lower()
-    educational = ['khan academy', 'coursera', 'edx', 'udemy', 'youtube education']
-    neutral = ['youtube', 'netflix', 'spotify']
-    
-    if any(term in platform_lower for term in educational):
+    if _EDUCATIONAL_PLATFORM_RE.search(platform):
         return 0.0  # Educational
-    elif any(term in platform_lower for term in neutral):
+    elif _NEUTRAL_PLATFORM_RE.search(platform):
         return 1.0  # Neutral
     else:
         return 2.0  # Potentially problematic
 
 
+# HabitsSummaryResponse field -> scorer, one entry per scored metric (15 in total)
+_HABIT_SCORERS = (
+    # Sleep summary (4 fields)
+    ('averageSleepQuality', score_sleep_quality),
+    ('averageSleepHours', score_sleep_hours),
+    ('averageBedtime', score_bedtime),
+    ('averageWakeTime', score_wake_time),
+    # Diet summary (3 fields)
+    ('averageWaterIntake', score_water_intake),
+    ('averageJunkFoodFrequency', score_junk_food_frequency),
+    ('averageMealsConsumed', score_meals_consumed),
+    # Exercise summary (3 fields)
+    ('averageExerciseHours', score_exercise_hours),
+    ('totalCaloriesBurned', score_calories_burned),
+    ('mostCommonExerciseType', score_exercise_type),
+    # Screen time summary (2 fields)
+    ('averageScreenTimeHours', score_screen_time_hours),
+    ('averagePreSleepScreenTime', score_pre_sleep_screen_time),
+    # Media consumption summary (3 fields)
+    ('averageMediaDuration', score_media_duration),
+    ('educationalContentCount', score_educational_content_count),
+    ('mostUsedPlatform', score_platform),
+)
+
+
 def calculate_habits_stress_score(habits_summary: Optional[Dict[str, Any]]) -> float:
     """
     Calculate stress score from HabitsSummaryResponse (0-30).
@@ -375,33 +588,205 @@ def calculate_habits_stress_score(habits_summary: Optional[Dict[str, Any]]) -> f
         return 15.0  # Default middle score if missing
     
     score = 0.0
+    for field, scorer in _HABIT_SCORERS:
+        score += scorer(habits_summary.get(field))
     
-    # Sleep summary (4 fields)
-    score += score_sleep_quality(habits_summary.get('averageSleepQuality'))
-    score += score_sleep_hours(habits_summary.get('averageSleepHours'))
-    score += score_bedtime(habits_summary.get('averageBedtime'))
-    score += score_wake_time(habits_summary.get('averageWakeTime'))
+    return min(30.0, max(0.0, score))  # Ensure 0-30 range
+
+
+def _prompt_digest(prompt: str) -> str:
+    """Stable cache key for a Deepseek prompt."""
+    return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _cache_get(cache: TTLCache, key: str) -> Any:
+    """Thread-safe lookup in one of the Deepseek result caches (None on miss)."""
+    with _deepseek_cache_lock:
+        return cache.get(key)
+
+
+def _cache_set(cache: TTLCache, key: str, value: Any):
+    """Thread-safe store into one of the Deepseek result caches."""
+    with _deepseek_cache_lock:
+        cache[key] = value
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of making a call while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker for an external service.
     
-    # Diet summary (3 fields)
-    score += score_water_intake(habits_summary.get('averageWaterIntake'))
-    score += score_junk_food_frequency(habits_summary.get('averageJunkFoodFrequency'))
-    score += score_meals_consumed(habits_summary.get('averageMealsConsumed'))
+    CLOSED: calls go through. After failure_threshold consecutive failures the
+    circuit goes OPEN and calls fail fast with CircuitOpenError. After
+    reset_timeout seconds it goes HALF_OPEN and lets a single probe call through:
+    success closes the circuit again, failure re-opens it.
     
-    # Exercise summary (3 fields)
-    score += score_exercise_hours(habits_summary.get('averageExerciseHours'))
-    score += score_calories_burned(habits_summary.get('totalCaloriesBurned'))
-    score += score_exercise_type(habits_summary.get('mostCommonExerciseType'))
+    before_call() returns a token (the state generation) that the caller passes
+    back when recording its result. Results of calls admitted before the last
+    state change are ignored, so calls still in flight when the circuit opened
+    can't postpone or pre-empt the half-open probe.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'CLOSED', 'OPEN', 'HALF_OPEN'
     
-    # Screen time summary (2 fields)
-    score += score_screen_time_hours(habits_summary.get('averageScreenTimeHours'))
-    score += score_pre_sleep_screen_time(habits_summary.get('averagePreSleepScreenTime'))
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._generation = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
     
-    # Media consumption summary (3 fields)
-    score += score_media_duration(habits_summary.get('averageMediaDuration'))
-    score += score_educational_content_count(habits_summary.get('educationalContentCount'))
-    score += score_platform(habits_summary.get('mostUsedPlatform'))
+    def _set_state(self, state: str):
+        # Caller holds self._lock
+        self.state = state
+        self._generation += 1
+        self._failures = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
     
-    return min(30.0, max(0.0, score))  # Ensure 0-30 range
+    def before_call(self) -> int:
+        """Return a token for recording the call's result, or raise CircuitOpenError."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return self._generation
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)  # This caller is the probe
+                return self._generation
+            raise CircuitOpenError(f"{self.name} circuit is {self.state}")
+    
+    def record_success(self, token: int):
+        with self._lock:
+            if token != self._generation:
+                return
+            if self.state == self.HALF_OPEN:
+                logger.info("%s circuit closed", self.name)
+                self._set_state(self.CLOSED)
+            else:
+                self._failures = 0
+    
+    def record_failure(self, token: int):
+        with self._lock:
+            if token != self._generation:
+                return
+            if self.state == self.HALF_OPEN:
+                logger.warning("%s circuit re-opened after a failed probe", self.name)
+                self._set_state(self.OPEN)
+                return
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                logger.warning("%s circuit opened after %d consecutive failures", self.name, self._failures)
+                self._set_state(self.OPEN)
+    
+    def record_status(self, token: int, status_code: int):
+        """Record an HTTP response: 5xx and 429 count as failures, anything else as success."""
+        if status_code >= 500 or status_code == 429:
+            self.record_failure(token)
+        else:
+            self.record_success(token)
+
+
+# Fail fast while Deepseek or the Spring Boot backend is down, instead of tying up
+# background workers on timeouts and retries for every queued student
+_deepseek_breaker = CircuitBreaker('Deepseek')
+_backend_breaker = CircuitBreaker('Backend')
+
+
+def _post_deepseek(payload: Dict[str, Any], timeout: int) -> requests.Response:
+    """
+    POST a chat completion payload to Deepseek.
+    Waits for a free slot first, so at most DEEPSEEK_MAX_CONCURRENCY calls are in flight.
+    Raises CircuitOpenError without calling out while Deepseek is failing.
+    """
+    with _deepseek_slots:
+        # Checked once a slot is free, so calls queued while Deepseek started failing fail fast too
+        breaker_token = _deepseek_breaker.before_call()
+        try:
+            response = SESSION.post(
+                DEEPSEEK_API_URL,
+                headers=_DEEPSEEK_HEADERS,
+                data=orjson.dumps(payload),
+                timeout=timeout
+            )
+        except Exception:
+            _deepseek_breaker.record_failure(breaker_token)
+            raise
+        _deepseek_breaker.record_status(breaker_token, response.status_code)
+    return response
+
+
+def _post_backend(url: str, body: bytes, headers: Mapping[str, str]) -> requests.Response:
+    """
+    POST a serialized JSON body to the Spring Boot backend.
+    Raises CircuitOpenError without calling out while the backend is failing.
+    """
+    breaker_token = _backend_breaker.before_call()
+    try:
+        response = SESSION.post(
+            url,
+            data=body,
+            headers=headers,
+            timeout=10
+        )
+    except Exception:
+        _backend_breaker.record_failure(breaker_token)
+        raise
+    _backend_breaker.record_status(breaker_token, response.status_code)
+    return response
+
+
+def _stream_deepseek_content(payload: Dict[str, Any], timeout: int) -> Optional[str]:
+    """
+    POST a streaming ("stream": true) chat completion payload to Deepseek and
+    collect the streamed message content. Stops collecting once a choice reports
+    finish_reason, but reads the stream to the end so the connection goes back to
+    the pool; if the reply was cut off by max_tokens, it is trimmed back to the
+    last complete sentence. Returns None on a non-200 response.
+    Raises CircuitOpenError without calling out while Deepseek is failing.
+    """
+    with _deepseek_slots:
+        # Checked once a slot is free, so calls queued while Deepseek started failing fail fast too
+        breaker_token = _deepseek_breaker.before_call()
+        try:
+            with SESSION.post(
+                DEEPSEEK_API_URL,
+                headers=_DEEPSEEK_HEADERS,
+                data=orjson.dumps(payload),
+                timeout=timeout,
+                stream=True
+            ) as response:
+                _deepseek_breaker.record_status(breaker_token, response.status_code)
+                if response.status_code != 200:
+                    response.content  # Read the error body so the connection can be reused
+                    return None
+                
+                content_parts = []
+                finish_reason = None
+                for line in response.iter_lines():
+                    # Server-sent events: "data: {...}" lines, ending with "data: [DONE]".
+                    # Lines after the finish are only drained, not parsed.
+                    if finish_reason or not line.startswith(b'data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == b'[DONE]':
+                        continue
+                    choice = (orjson.loads(data).get('choices') or [{}])[0]
+                    content_parts.append((choice.get('delta') or {}).get('content') or '')
+                    finish_reason = choice.get('finish_reason')
+        except Exception:
+            _deepseek_breaker.record_failure(breaker_token)
+            raise
+    
+    content = "".join(content_parts).strip()
+    if finish_reason == 'length':
+        last_sentence_end = content.rfind('.')
+        if last_sentence_end > 0:
+            content = content[:last_sentence_end + 1]
+    return content
 
 
 def analyze_complaints_with_deepseek(complaints: List[Dict[str, Any]]) -> float:
@@ -416,17 +801,13 @@ def analyze_complaints_with_deepseek(complaints: List[Dict[str, Any]]) -> float:
         return min(30.0, len(complaints) * 5.0)  # 5 points per complaint, max 30
     
     try:
-        # Combine all complaint descriptions
-        complaint_texts = []
-        for complaint in complaints:
-            desc = complaint.get('description', '')
-            if desc:
-                complaint_texts.append(desc)
-        
-        if not complaint_texts:
-            return 0.0
+        # Combine all non-blank complaint descriptions
+        combined_text = "\n\n".join(
+            desc for desc in (complaint.get('description', '') for complaint in complaints) if desc
+        )
         
-        combined_text = "\n\n".join(complaint_texts)
+        if not combined_text:
+            return 0.0  # All descriptions blank, nothing to send
         
         # Prepare prompt for Deepseek
         prompt = f"""Analyze the following student complaints and assess the stress level they indicate.
@@ -441,46 +822,43 @@ Rate the stress level indicated by these complaints on a scale of 0-30, where:
 
 Respond with ONLY a number between 0 and 30, no other text."""
         
-        # Call Deepseek API
-        headers = {
-            'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
-            'Content-Type': 'application/json'
-        }
+        cache_key = _prompt_digest(prompt)
+        cached_score = _cache_get(_complaints_score_cache, cache_key)
+        if cached_score is not None:
+            return cached_score
         
+        # Call Deepseek API
         payload = {
-            'model': 'deepseek-chat',
-            'messages': [
-                {'role': 'user', 'content': prompt}
-            ],
+            **_DEEPSEEK_PAYLOAD_BASE,
+            'messages': [{'role': 'user', 'content': prompt}],
             'temperature': 0.3,
             'max_tokens': 10
         }
         
-        response = requests.post(
-            DEEPSEEK_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=10
-        )
+        response = _post_deepseek(payload, timeout=10)
         
         if response.status_code == 200:
-            result = response.json()
-            content = result.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
+            result = orjson.loads(response.content)
+            content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
             
-            # Extract number from response
+            # Extract number from response (float() already ignores surrounding whitespace)
             try:
-                score = float(content)
-                return min(30.0, max(0.0, score))
-            except ValueError:
+                score = min(30.0, max(0.0, float(content)))
+                _cache_set(_complaints_score_cache, cache_key, score)
+                return score
+            except (ValueError, TypeError):
                 # Fallback if parsing fails
                 return min(30.0, len(complaints) * 5.0)
         else:
             # Fallback on API error
             return min(30.0, len(complaints) * 5.0)
             
+    except CircuitOpenError:
+        # Deepseek is down: heuristic fallback without a call (or a stack trace per student)
+        return min(30.0, len(complaints) * 5.0)
     except Exception as e:
         # Fallback on any error
-        print(f"Error calling Deepseek API: {e}")
+        logger.exception("Error calling Deepseek API: %s", e)
         return min(30.0, len(complaints) * 5.0)
 
 
@@ -519,6 +897,19 @@ def calculate_pulse_stress_score(pulse: Optional[Dict[str, Any]]) -> float:
     return min(30.0, max(6.0, score))  # Ensure 6-30 range
 
 
+_HABIT_FIELDS = tuple(field for field, _ in _HABIT_SCORERS)
+
+
+@lru_cache(maxsize=4096)
+def _local_stress_scores(habit_values: Optional[tuple], pulse_rating: Any) -> tuple:
+    """
+    (habits score, pulse score) memoized on the exact inputs they read: the scored
+    habit field values in _HABIT_FIELDS order (None without a summary) and the pulse rating.
+    """
+    habits_summary = None if habit_values is None else dict(zip(_HABIT_FIELDS, habit_values))
+    return calculate_habits_stress_score(habits_summary), calculate_pulse_stress_score({'rating': pulse_rating})
+
+
 def calculate_stress_score(student_info: Dict[str, Any]) -> float:
     """
     Calculate overall stress score (0-90) from student information.
@@ -530,9 +921,30 @@ def calculate_stress_score(student_info: Dict[str, Any]) -> float:
     
     Total: 0-90
     """
-    habits_score = calculate_habits_stress_score(student_info.get('habitsSummary'))
-    complaints_score = analyze_complaints_with_deepseek(student_info.get('unresolvedComplaints') or [])
-    pulse_score = calculate_pulse_stress_score(student_info.get('currentWeekPulse'))
+    complaints = student_info.get('unresolvedComplaints') or []
+    
+    # Start the (network-bound) complaints analysis first so it overlaps with local scoring.
+    # Without complaints (the common case) or an API key there is no call to overlap.
+    complaints_future = None
+    if complaints and DEEPSEEK_API_KEY:
+        complaints_future = deepseek_executor.submit(analyze_complaints_with_deepseek, complaints)
+    
+    habits_summary = student_info.get('habitsSummary')
+    pulse = student_info.get('currentWeekPulse')
+    habit_values = tuple(habits_summary.get(field) for field in _HABIT_FIELDS) if habits_summary else None
+    try:
+        habits_score, pulse_score = _local_stress_scores(habit_values, pulse.get('rating') if pulse else None)
+    except TypeError:
+        # Unhashable field value (unexpected payload shape): score without the cache
+        habits_score = calculate_habits_stress_score(habits_summary)
+        pulse_score = calculate_pulse_stress_score(pulse)
+    
+    if complaints_future is not None:
+        complaints_score = complaints_future.result()
+    elif complaints:
+        complaints_score = analyze_complaints_with_deepseek(complaints)  # Heuristic fallback, no I/O
+    else:
+        complaints_score = 0.0
     
     total_score = habits_score + complaints_score + pulse_score
     
@@ -544,7 +956,12 @@ def stress_score_to_percentage(stress_score: float) -> int:
     Convert stress score (0-90) to percentage (0-100).
     """
     percentage = int((stress_score / 90.0) * 100)
-    return min(100, max(0, percentage))
+    return 0 if percentage < 0 else 100 if percentage > 100 else percentage
+
+
+# Stress color bands (inclusive upper bounds 30/60/75) for get_stress_color
+_STRESS_COLOR_BREAKS = (_upto(30), _upto(60), _upto(75))
+_STRESS_COLORS = ("GREEN", "YELLOW", "ORANGE", "RED")
 
 
 def get_stress_color(stress_score: float) -> str:
@@ -557,14 +974,54 @@ def get_stress_color(stress_score: float) -> str:
     - Orange (61-75): High stress
     - Red (76-90): Very high stress
     """
-    if stress_score <= 30:
-        return "GREEN"
-    elif stress_score <= 60:
-        return "YELLOW"
-    elif stress_score <= 75:
-        return "ORANGE"
-    else:
-        return "RED"
+    return _STRESS_COLORS[bisect_right(_STRESS_COLOR_BREAKS, stress_score)]
+
+
+# Static parts of the personalized habits prompt; only the profile section varies per student
+_HABITS_PROMPT_PREAMBLE = """You are a wellness coach helping to create personalized daily habits for a student. 
+Generate 2-3 specific, actionable daily habits that are tailored to this student's profile.
+
+IMPORTANT: Respond ONLY with a JSON array of habit descriptions (strings only).
+Each description should be a clear, actionable statement (max 200 characters).
+
+Format your response as valid JSON only, no additional text or explanation.
+
+Student Profile:
+"""
+
+_HABITS_PROMPT_EPILOGUE = """
+\nBased on this profile, generate 2-3 personalized daily habits that:
+1. Align with the student's interests, physical profile, and personality
+2. Are specific, measurable, and achievable
+3. Promote overall wellbeing and stress reduction
+4. Consider physical attributes when relevant (e.g., if student has basketball as hobby and height is 190 cm, suggest "Practice 5 slam dunks")
+
+Remember: Respond with ONLY a JSON array of strings, no other text.
+Example format:
+[
+  "Start each day with 10 minutes of meditation focusing on breath",
+  "Drink 8 glasses of water throughout the day, tracking intake"
+]
+"""
+
+
+# OCEAN (Big5) traits summarized in the habits prompt, with the facets averaged for each
+_OCEAN_TRAITS = (
+    ('Openness', ('imagination', 'artisticInterests', 'intellect')),
+    ('Conscientiousness', ('selfEfficacy', 'orderliness', 'achievementStriving')),
+    ('Extraversion', ('friendliness', 'activityLevel', 'cheerfulness')),
+    ('Neuroticism', ('anxiety', 'depression', 'vulnerability')),
+)
+
+
+# Template for the no-API-key hobby habit
+_HOBBY_HABIT_TEMPLATE = "Dedicate 30 minutes daily to practice {} to develop your skills and passion"
+
+# Habits returned when Deepseek fails or returns nothing usable
+_FALLBACK_HABITS = (
+    "Engage in at least 30 minutes of physical activity daily",
+    "Practice 5 minutes of deep breathing exercises each morning"
+)
 
 
 def generate_personalized_habits(student_info: Dict[str, Any]) -> List[str]:
@@ -591,7 +1048,7 @@ def generate_personalized_habits(student_info: Dict[str, Any]) -> List[str]:
         # Add hobby-based habit if available
         if hobbies and len(hobbies) > 0:
             hobby = hobbies[0] if isinstance(hobbies[0], str) else str(hobbies[0])
-            habits.append(f"Dedicate 30 minutes daily to practice {hobby.lower().replace('_', ' ')} to develop your skills and passion")
+            habits.append(_HOBBY_HABIT_TEMPLATE.format(hobby.lower().replace('_', ' ')))
         else:
             habits.append("Engage in at least 30 minutes of physical activity daily to boost energy and mood")
         
@@ -623,16 +1080,7 @@ def generate_personalized_habits(student_info: Dict[str, Any]) -> List[str]:
         # Build comprehensive prompt
         prompt_parts = []
         
-        prompt_parts.append("""You are a wellness coach helping to create personalized daily habits for a student. 
-Generate 2-3 specific, actionable daily habits that are tailored to this student's profile.
-
-IMPORTANT: Respond ONLY with a JSON array of habit descriptions (strings only).
-Each description should be a clear, actionable statement (max 200 characters).
-
-Format your response as valid JSON only, no additional text or explanation.
-
-Student Profile:
-""")
+        prompt_parts.append(_HABITS_PROMPT_PREAMBLE)
         
         # Add physical profile
         if physical_profile:
@@ -682,102 +1130,49 @@ Student Profile:
         # Add OCEAN personality traits (key traits only)
         if ocean_score:
             prompt_parts.append("\nPersonality Traits (OCEAN Big5):\n")
-            # Extract key traits
+            # Extract key traits (each averages whichever of its facets are present)
             key_traits = []
-            if ocean_score.get('openness') is not None or ocean_score.get('imagination') is not None:
-                imagination = ocean_score.get('imagination')
-                artistic = ocean_score.get('artisticInterests')
-                intellect = ocean_score.get('intellect')
-                # Only calculate if at least one value is not None
-                if any(v is not None for v in [imagination, artistic, intellect]):
-                    values = [v for v in [imagination, artistic, intellect] if v is not None]
-                    openness_avg = sum(values) / len(values)
-                    key_traits.append(f"Openness: {openness_avg:.1f}/100")
-            
-            if ocean_score.get('conscientiousness') is not None or ocean_score.get('selfEfficacy') is not None:
-                self_eff = ocean_score.get('selfEfficacy')
-                order = ocean_score.get('orderliness')
-                achieve = ocean_score.get('achievementStriving')
-                # Only calculate if at least one value is not None
-                if any(v is not None for v in [self_eff, order, achieve]):
-                    values = [v for v in [self_eff, order, achieve] if v is not None]
-                    consc_avg = sum(values) / len(values)
-                    key_traits.append(f"Conscientiousness: {consc_avg:.1f}/100")
-            
-            if ocean_score.get('extraversion') is not None or ocean_score.get('friendliness') is not None:
-                friend = ocean_score.get('friendliness')
-                activity = ocean_score.get('activityLevel')
-                cheer = ocean_score.get('cheerfulness')
-                # Only calculate if at least one value is not None
-                if any(v is not None for v in [friend, activity, cheer]):
-                    values = [v for v in [friend, activity, cheer] if v is not None]
-                    extra_avg = sum(values) / len(values)
-                    key_traits.append(f"Extraversion: {extra_avg:.1f}/100")
-            
-            if ocean_score.get('neuroticism') is not None or ocean_score.get('anxiety') is not None:
-                anxiety = ocean_score.get('anxiety')
-                depression = ocean_score.get('depression')
-                vulnerability = ocean_score.get('vulnerability')
-                # Only calculate if at least one value is not None
-                if any(v is not None for v in [anxiety, depression, vulnerability]):
-                    values = [v for v in [anxiety, depression, vulnerability] if v is not None]
-                    neuro_avg = sum(values) / len(values)
-                    key_traits.append(f"Neuroticism: {neuro_avg:.1f}/100")
+            for trait, facets in _OCEAN_TRAITS:
+                values = [v for v in (ocean_score.get(facet) for facet in facets) if v is not None]
+                if values:
+                    key_traits.append(f"{trait}: {sum(values) / len(values):.1f}/100")
             
             if key_traits:
                 prompt_parts.append("- " + ", ".join(key_traits) + "\n")
         
-        prompt_parts.append("""
-\nBased on this profile, generate 2-3 personalized daily habits that:
-1. Align with the student's interests, physical profile, and personality
-2. Are specific, measurable, and achievable
-3. Promote overall wellbeing and stress reduction
-4. Consider physical attributes when relevant (e.g., if student has basketball as hobby and height is 190 cm, suggest "Practice 5 slam dunks")
-
-Remember: Respond with ONLY a JSON array of strings, no other text.
-Example format:
-[
-  "Start each day with 10 minutes of meditation focusing on breath",
-  "Drink 8 glasses of water throughout the day, tracking intake"
-]
-""")
+        prompt_parts.append(_HABITS_PROMPT_EPILOGUE)
         
         prompt = "".join(prompt_parts)
         
-        # Call Deepseek API
-        headers = {
-            'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
-            'Content-Type': 'application/json'
-        }
+        cache_key = _prompt_digest(prompt)
+        cached_habits = _cache_get(_habits_cache, cache_key)
+        if cached_habits is not None:
+            return list(cached_habits)
         
+        # Call Deepseek API
         payload = {
-            'model': 'deepseek-chat',
-            'messages': [
-                {'role': 'user', 'content': prompt}
-            ],
+            **_DEEPSEEK_PAYLOAD_BASE,
+            'messages': [{'role': 'user', 'content': prompt}],
             'temperature': 0.7,
             'max_tokens': 500
         }
         
-        response = requests.post(
-            DEEPSEEK_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=15
-        )
+        response = _post_deepseek(payload, timeout=15)
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             content = result.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
             
             # Try to parse JSON from response
-            # Sometimes the response might have markdown code blocks
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                content = json_match.group(0)
+            # Sometimes the response might have markdown code blocks, so keep
+            # only the outermost [...] span
+            array_start = content.find('[')
+            array_end = content.rfind(']')
+            if 0 <= array_start < array_end:
+                content = content[array_start:array_end + 1]
             
             try:
-                habits = json.loads(content)
+                habits = orjson.loads(content)
                 # Validate structure - expect list of strings
                 if isinstance(habits, list) and len(habits) > 0:
                     validated_habits = []
@@ -788,23 +1183,20 @@ Example format:
                             # Handle legacy format with title/description
                             validated_habits.append(str(habit['description'])[:200])
                     if validated_habits:
+                        _cache_set(_habits_cache, cache_key, tuple(validated_habits))
                         return validated_habits
-            except json.JSONDecodeError:
-                print(f"Warning: Failed to parse habits JSON. Response: {content}")
+            except orjson.JSONDecodeError:
+                logger.warning("Failed to parse habits JSON. Response: %s", content)
         
         # Fallback on error
-        return [
-            "Engage in at least 30 minutes of physical activity daily",
-            "Practice 5 minutes of deep breathing exercises each morning"
-        ]
+        return list(_FALLBACK_HABITS)
         
+    except CircuitOpenError:
+        return list(_FALLBACK_HABITS)
     except Exception as e:
-        print(f"Error generating habits with Deepseek: {e}")
+        logger.exception("Error generating habits with Deepseek: %s", e)
         # Fallback habits
-        return [
-            "Engage in at least 30 minutes of physical activity daily",
-            "Practice 5 minutes of deep breathing exercises each morning"
-        ]
+        return list(_FALLBACK_HABITS)
 
 
 def save_guidances(student_id: int, guidances: List[str], guidance_date: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
@@ -831,25 +1223,156 @@ def save_guidances(student_id: int, guidances: List[str], guidance_date: Optiona
             "date": guidance_date
         }
         
-        headers = get_auth_headers()
-        response = requests.post(
-            url,
-            json=payload,
-            headers=headers,
-            timeout=10
-        )
+        response = _post_backend(url, orjson.dumps(payload), get_auth_headers())
         
         if response.status_code == 201:
-            return response.json()
+            return orjson.loads(response.content)
         else:
-            print(f"Warning: Failed to save guidances. Status: {response.status_code}, Response: {response.text}")
+            logger.warning("Failed to save guidances. Status: %s, Response: %s", response.status_code, response.text)
             return None
             
-    except requests.exceptions.RequestException as e:
-        print(f"Warning: Error saving guidances: {str(e)}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.warning("Error saving guidances: %s", e)
         return None
 
 
+# Jinja environment for prompt templates; block tags don't leave blank lines behind
+_PROMPT_ENV = Environment(trim_blocks=True, lstrip_blocks=True, auto_reload=False)
+
+# Wellbeing gist prompt, compiled once at import
+_WELLBEING_PROMPT_TEMPLATE = _PROMPT_ENV.from_string("""\
+You are a student wellness advisor. Based on the following student data, write a brief, empathetic paragraph (3-5 sentences) summarizing how the student is doing overall. Be supportive and constructive.
+
+Student Data:
+{% if habits %}
+
+Habits Summary (Last 30 days):
+{% if habits.get('averageSleepQuality') is not none %}
+- Sleep Quality: {{ habits.get('averageSleepQuality') }}/10
+{% endif %}
+{% if habits.get('averageSleepHours') is not none %}
+- Average Sleep Hours: {{ habits.get('averageSleepHours') }} hours
+{% endif %}
+{% if habits.get('averageBedtime') is not none %}
+- Average Bedtime: {{ habits.get('averageBedtime') }}
+{% endif %}
+{% if habits.get('averageWakeTime') is not none %}
+- Average Wake Time: {{ habits.get('averageWakeTime') }}
+{% endif %}
+{% if habits.get('averageWaterIntake') is not none %}
+- Average Water Intake: {{ habits.get('averageWaterIntake') }}L/day
+{% endif %}
+{% if habits.get('averageJunkFoodFrequency') is not none %}
+- Junk Food Frequency: {{ habits.get('averageJunkFoodFrequency') }} times/week
+{% endif %}
+{% if habits.get('averageMealsConsumed') is not none %}
+- Average Meals: {{ habits.get('averageMealsConsumed') }}/day
+{% endif %}
+{% if habits.get('averageExerciseHours') is not none %}
+- Average Exercise: {{ habits.get('averageExerciseHours') }} hours/day
+{% endif %}
+{% if habits.get('mostCommonExerciseType') %}
+- Preferred Exercise: {{ habits.get('mostCommonExerciseType') }}
+{% endif %}
+{% if habits.get('averageScreenTimeHours') is not none %}
+- Average Screen Time: {{ habits.get('averageScreenTimeHours') }} hours/day
+{% endif %}
+{% if habits.get('averagePreSleepScreenTime') is not none %}
+- Pre-Sleep Screen Time: {{ habits.get('averagePreSleepScreenTime') }} hours
+{% endif %}
+{% if habits.get('educationalContentCount') is not none %}
+- Educational Content Consumed: {{ habits.get('educationalContentCount') }} items
+{% endif %}
+{% else %}
+
+No habits data available.
+{% endif %}
+{% if complaints %}
+
+Unresolved Complaints ({{ complaint_count }} total):
+{% for complaint in complaints %}
+- Complaint {{ loop.index }}: {{ complaint.get('description', 'No description') }} (Status: {{ complaint.get('status', 'Unknown') }})
+{% endfor %}
+{% else %}
+
+No unresolved complaints.
+{% endif %}
+{% if pulse %}
+
+Current Week Pulse:
+{% if pulse.get('rating') is not none %}
+- Overall Rating: {{ pulse.get('rating') }}
+{% endif %}
+{% if pulse.get('feedback') %}
+- Feedback: {{ pulse.get('feedback') }}
+{% endif %}
+{% else %}
+
+No pulse data available for this week.
+{% endif %}
+
+Write a 3-5 sentence supportive paragraph.
+Respond with ONLY the paragraph, no additional formatting or labels.""")
+
+
+# ComplaintResponse fields used by the wellbeing prompt
+_PROMPT_COMPLAINT_FIELDS = ('description', 'status')
+
+# Gist returned when Deepseek fails or returns nothing usable
+_UNAVAILABLE_WELLBEING_GIST = "We're currently unable to generate a detailed wellbeing assessment. Please check back later."
+
+# Generic gist for students without usable wellbeing data
+_DEFAULT_WELLBEING_GIST = "Based on the available data, you appear to be maintaining a balanced lifestyle. Keep focusing on healthy habits and don't hesitate to seek support when needed. Remember that small consistent efforts lead to big improvements in overall wellbeing."
+
+# No-API-key gist rules, as (habitsSummary field, predicate, template); a rule applies
+# when the field is set (truthy) and its predicate holds, formatted with v=<value>
+_FALLBACK_HABIT_RULES = (
+    ('averageSleepHours', lambda v: v >= 7,
+     "You're getting a healthy {v:.1f} hours of sleep on average, which is great for your wellbeing."),
+    ('averageSleepHours', lambda v: v < 7,
+     "Your average sleep of {v:.1f} hours could be improved - aim for 7-9 hours for optimal health."),
+    ('averageExerciseHours', lambda v: v >= 1,
+     "Your exercise routine of {v:.1f} hours daily shows good commitment to physical health."),
+    ('averageExerciseHours', lambda v: v < 1,
+     "Consider adding more physical activity to your routine for better overall wellness."),
+    ('averageScreenTimeHours', lambda v: v > 4,
+     "Your screen time is on the higher side - taking regular breaks can help reduce eye strain and improve focus."),
+)
+
+# Pulse rating bands for the no-API-key gist: below 2, 2 to below 4, 4 and up
+_FALLBACK_PULSE_BREAKS = (2, 4)
+_FALLBACK_PULSE_SENTENCES = (
+    "Your recent mood rating indicates you might be going through a tough time. Consider reaching out to someone you trust.",
+    "Your recent mood has been moderate. Remember to take time for activities you enjoy.",
+    "Your recent mood rating suggests you're feeling good - keep up the positive momentum!",
+)
+
+_FALLBACK_COMPLAINTS_TEMPLATE = "You have {count} unresolved concern(s) being addressed. Remember, seeking help is a sign of strength."
+_FALLBACK_NO_COMPLAINTS = "It's positive that you don't have any pending concerns at the moment."
+
+# Habit fields informative enough on their own to be worth a Deepseek gist
+# (bedtime and wake time alone say little about how a student is doing)
+_GIST_SIGNAL_HABIT_FIELDS = (
+    'averageSleepQuality', 'averageSleepHours', 'averageWaterIntake', 'averageJunkFoodFrequency',
+    'averageMealsConsumed', 'averageExerciseHours', 'mostCommonExerciseType', 'averageScreenTimeHours',
+    'averagePreSleepScreenTime', 'educationalContentCount'
+)
+
+# Number of gists answered with the generic paragraph instead of calling Deepseek
+_gist_bypass_counter = itertools.count(1)
+
+
+def _has_gist_signal(habits_summary: Dict[str, Any], unresolved_complaints: List[Dict[str, Any]],
+                     current_week_pulse: Dict[str, Any]) -> bool:
+    """Whether the student data has anything for Deepseek to summarize beyond the generic gist."""
+    return (
+        bool(unresolved_complaints)
+        or bool(current_week_pulse.get('rating'))
+        or bool(current_week_pulse.get('feedback'))
+        or any(habits_summary.get(field) is not None for field in _GIST_SIGNAL_HABIT_FIELDS)
+    )
+
+
 def generate_wellbeing_gist(student_info: Dict[str, Any]) -> str:
     """
     Generate a wellbeing gist paragraph using Deepseek API.
@@ -868,154 +1391,75 @@ def generate_wellbeing_gist(student_info: Dict[str, Any]) -> str:
     
     if not DEEPSEEK_API_KEY:
         # Fallback: generate a basic wellbeing gist based on available data (for testing without API key)
-        gist_parts = []
-        
-        # Analyze habits
-        if habits_summary:
-            sleep_hours = habits_summary.get('averageSleepHours')
-            exercise_hours = habits_summary.get('averageExerciseHours')
-            screen_time = habits_summary.get('averageScreenTimeHours')
-            
-            if sleep_hours:
-                if sleep_hours >= 7:
-                    gist_parts.append(f"You're getting a healthy {sleep_hours:.1f} hours of sleep on average, which is great for your wellbeing.")
-                else:
-                    gist_parts.append(f"Your average sleep of {sleep_hours:.1f} hours could be improved - aim for 7-9 hours for optimal health.")
-            
-            if exercise_hours:
-                if exercise_hours >= 1:
-                    gist_parts.append(f"Your exercise routine of {exercise_hours:.1f} hours daily shows good commitment to physical health.")
-                else:
-                    gist_parts.append("Consider adding more physical activity to your routine for better overall wellness.")
-            
-            if screen_time and screen_time > 4:
-                gist_parts.append("Your screen time is on the higher side - taking regular breaks can help reduce eye strain and improve focus.")
+        gist_parts = [
+            template.format(v=value)
+            for field, predicate, template in _FALLBACK_HABIT_RULES
+            if (value := habits_summary.get(field)) and predicate(value)
+        ]
         
-        # Analyze complaints
-        if unresolved_complaints and len(unresolved_complaints) > 0:
-            gist_parts.append(f"You have {len(unresolved_complaints)} unresolved concern(s) being addressed. Remember, seeking help is a sign of strength.")
+        if unresolved_complaints:
+            gist_parts.append(_FALLBACK_COMPLAINTS_TEMPLATE.format(count=len(unresolved_complaints)))
         else:
-            gist_parts.append("It's positive that you don't have any pending concerns at the moment.")
+            gist_parts.append(_FALLBACK_NO_COMPLAINTS)
         
-        # Analyze pulse
-        if current_week_pulse and current_week_pulse.get('rating'):
-            rating = current_week_pulse.get('rating')
-            if rating >= 4:
-                gist_parts.append("Your recent mood rating suggests you're feeling good - keep up the positive momentum!")
-            elif rating >= 2:
-                gist_parts.append("Your recent mood has been moderate. Remember to take time for activities you enjoy.")
-            else:
-                gist_parts.append("Your recent mood rating indicates you might be going through a tough time. Consider reaching out to someone you trust.")
+        rating = current_week_pulse.get('rating')
+        if rating:
+            gist_parts.append(_FALLBACK_PULSE_SENTENCES[bisect_right(_FALLBACK_PULSE_BREAKS, rating)])
         
         if gist_parts:
             return " ".join(gist_parts)
         else:
-            return "Based on the available data, you appear to be maintaining a balanced lifestyle. Keep focusing on healthy habits and don't hesitate to seek support when needed. Remember that small consistent efforts lead to big improvements in overall wellbeing."
+            return _DEFAULT_WELLBEING_GIST
+    
+    if not _has_gist_signal(habits_summary, unresolved_complaints, current_week_pulse):
+        # Nothing worth sending: Deepseek would only restate the generic paragraph
+        logger.debug("Wellbeing gist: no usable signal, skipping Deepseek (bypass #%d)", next(_gist_bypass_counter))
+        return _DEFAULT_WELLBEING_GIST
     
     try:
-        # Build comprehensive prompt
-        prompt_parts = []
-        
-        prompt_parts.append("""You are a student wellness advisor. Based on the following student data, write a brief, empathetic paragraph (3-5 sentences) summarizing how the student is doing overall. Be supportive and constructive.
-
-Student Data:
-""")
-        
-        # Add habits summary
-        if habits_summary:
-            prompt_parts.append("\nHabits Summary (Last 30 days):\n")
-            if habits_summary.get('averageSleepQuality') is not None:
-                prompt_parts.append(f"- Sleep Quality: {habits_summary.get('averageSleepQuality')}/10\n")
-            if habits_summary.get('averageSleepHours') is not None:
-                prompt_parts.append(f"- Average Sleep Hours: {habits_summary.get('averageSleepHours')} hours\n")
-            if habits_summary.get('averageBedtime') is not None:
-                prompt_parts.append(f"- Average Bedtime: {habits_summary.get('averageBedtime')}\n")
-            if habits_summary.get('averageWakeTime') is not None:
-                prompt_parts.append(f"- Average Wake Time: {habits_summary.get('averageWakeTime')}\n")
-            if habits_summary.get('averageWaterIntake') is not None:
-                prompt_parts.append(f"- Average Water Intake: {habits_summary.get('averageWaterIntake')}L/day\n")
-            if habits_summary.get('averageJunkFoodFrequency') is not None:
-                prompt_parts.append(f"- Junk Food Frequency: {habits_summary.get('averageJunkFoodFrequency')} times/week\n")
-            if habits_summary.get('averageMealsConsumed') is not None:
-                prompt_parts.append(f"- Average Meals: {habits_summary.get('averageMealsConsumed')}/day\n")
-            if habits_summary.get('averageExerciseHours') is not None:
-                prompt_parts.append(f"- Average Exercise: {habits_summary.get('averageExerciseHours')} hours/day\n")
-            if habits_summary.get('mostCommonExerciseType'):
-                prompt_parts.append(f"- Preferred Exercise: {habits_summary.get('mostCommonExerciseType')}\n")
-            if habits_summary.get('averageScreenTimeHours') is not None:
-                prompt_parts.append(f"- Average Screen Time: {habits_summary.get('averageScreenTimeHours')} hours/day\n")
-            if habits_summary.get('averagePreSleepScreenTime') is not None:
-                prompt_parts.append(f"- Pre-Sleep Screen Time: {habits_summary.get('averagePreSleepScreenTime')} hours\n")
-            if habits_summary.get('educationalContentCount') is not None:
-                prompt_parts.append(f"- Educational Content Consumed: {habits_summary.get('educationalContentCount')} items\n")
-        else:
-            prompt_parts.append("\nNo habits data available.\n")
-        
-        # Add unresolved complaints
-        if unresolved_complaints and len(unresolved_complaints) > 0:
-            prompt_parts.append(f"\nUnresolved Complaints ({len(unresolved_complaints)} total):\n")
-            for i, complaint in enumerate(unresolved_complaints[:5], 1):  # Limit to first 5
-                desc = complaint.get('description', 'No description')
-                status = complaint.get('status', 'Unknown')
-                prompt_parts.append(f"- Complaint {i}: {desc} (Status: {status})\n")
-        else:
-            prompt_parts.append("\nNo unresolved complaints.\n")
-        
-        # Add current week pulse
-        if current_week_pulse:
-            prompt_parts.append("\nCurrent Week Pulse:\n")
-            if current_week_pulse.get('rating') is not None:
-                prompt_parts.append(f"- Overall Rating: {current_week_pulse.get('rating')}\n")
-            if current_week_pulse.get('feedback'):
-                prompt_parts.append(f"- Feedback: {current_week_pulse.get('feedback')}\n")
-        else:
-            prompt_parts.append("\nNo pulse data available for this week.\n")
-        
-        prompt_parts.append("""
-Write a supportive, personalized paragraph (3-5 sentences) about how this student is doing. Focus on:
-1. Overall wellbeing based on habits
-2. Any concerns from complaints
-3. Recent mood/pulse data
-4. Encouragement and constructive observations
-
-Respond with ONLY the paragraph, no additional formatting or labels.""")
-        
-        prompt = "".join(prompt_parts)
+        # Only the first 5 complaints are listed, and only the fields the prompt reads
+        prompt_complaints = [
+            {field: complaint[field] for field in _PROMPT_COMPLAINT_FIELDS if field in complaint}
+            for complaint in unresolved_complaints[:5]
+        ]
+        prompt = _WELLBEING_PROMPT_TEMPLATE.render(
+            habits=habits_summary,
+            complaints=prompt_complaints,
+            complaint_count=len(unresolved_complaints),
+            pulse=current_week_pulse
+        )
         
-        # Call Deepseek API
-        headers = {
-            'Authorization': f'Bearer {DEEPSEEK_API_KEY}',
-            'Content-Type': 'application/json'
-        }
+        cache_key = _prompt_digest(prompt)
+        cached_gist = _cache_get(_gist_cache, cache_key)
+        if cached_gist is not None:
+            return cached_gist
         
+        # Call Deepseek API (3-5 sentences fit comfortably in 180 tokens)
         payload = {
-            'model': 'deepseek-chat',
-            'messages': [
-                {'role': 'user', 'content': prompt}
-            ],
+            **_DEEPSEEK_PAYLOAD_BASE,
+            'messages': [{'role': 'user', 'content': prompt}],
             'temperature': 0.7,
-            'max_tokens': 300
+            'max_tokens': 180,
+            'stream': True
         }
         
-        response = requests.post(
-            DEEPSEEK_API_URL,
-            headers=headers,
-            json=payload,
-            timeout=15
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            content = result.get('choices', [{}])[0].get('message', {}).get('content', '').strip()
-            if content:
-                return content
+        content = _stream_deepseek_content(payload, timeout=15)
+        if content:
+            _cache_set(_gist_cache, cache_key, content)
+            return content
         
         # Fallback on error
-        return "We're currently unable to generate a detailed wellbeing assessment. Please check back later."
+        return _UNAVAILABLE_WELLBEING_GIST
         
+    except CircuitOpenError:
+        return _UNAVAILABLE_WELLBEING_GIST
     except Exception as e:
-        print(f"Error generating wellbeing gist with Deepseek: {e}")
-        return "We're currently unable to generate a detailed wellbeing assessment. Please check back later."
+        logger.exception("Error generating wellbeing gist with Deepseek: %s", e)
+        return _UNAVAILABLE_WELLBEING_GIST
+
+
+# POST /wellbeing body, filled in directly; the colour is one of the fixed _STRESS_COLORS
+_WELLBEING_BODY_TEMPLATE = b'{"stressPercentage":%d,"stressColour":"%s","wellbeingGist":%s}'
 
 
 def save_wellbeing_data(student_id: int, stress_score: float, wellbeing_gist: str) -> Optional[Dict[str, Any]]:
@@ -1032,43 +1476,89 @@ def save_wellbeing_data(student_id: int, stress_score: float, wellbeing_gist: st
     try:
         url = f"{BASE_URL}/wellbeing/{student_id}"
         
-        stress_percentage = stress_score_to_percentage(stress_score)
-        stress_colour = get_stress_color(stress_score)
+        body = _WELLBEING_BODY_TEMPLATE % (
+            stress_score_to_percentage(stress_score),
+            get_stress_color(stress_score).encode(),
+            orjson.dumps(wellbeing_gist)
+        )
+        
+        response = _post_backend(url, body, get_auth_headers())
+        
+        if response.status_code == 201:
+            return orjson.loads(response.content)
+        else:
+            logger.warning("Failed to save wellbeing data. Status: %s, Response: %s", response.status_code, response.text)
+            return None
+            
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.warning("Error saving wellbeing data: %s", e)
+        return None
+
+
+def save_combined_results(student_id: int, stress_score: float, wellbeing_gist: str,
+                          guidances: List[str], guidance_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Save wellbeing data and guidances for a student in a single backend call.
+    
+    POST /student-mentor/{studentId}/results
+    Body: {
+        "wellbeing": {
+            "stressPercentage": int (0-100),
+            "stressColour": string,
+            "wellbeingGist": string
+        },
+        "guidance": {
+            "guidances": ["guidance1", "guidance2", "guidance3"],
+            "date": "2024-01-15"
+        }
+    }
+    """
+    try:
+        url = f"{BASE_URL}/student-mentor/{student_id}/results"
+        
+        # Use today's date if not provided
+        if guidance_date is None:
+            guidance_date = date.today().isoformat()
         
         payload = {
-            "stressPercentage": stress_percentage,
-            "stressColour": stress_colour,
-            "wellbeingGist": wellbeing_gist
+            "wellbeing": {
+                "stressPercentage": stress_score_to_percentage(stress_score),
+                "stressColour": get_stress_color(stress_score),
+                "wellbeingGist": wellbeing_gist
+            },
+            "guidance": {
+                "guidances": guidances,
+                "date": guidance_date
+            }
         }
         
-        headers = get_auth_headers()
-        response = requests.post(
-            url,
-            json=payload,
-            headers=headers,
-            timeout=10
-        )
+        response = _post_backend(url, orjson.dumps(payload), get_auth_headers())
         
         if response.status_code == 201:
-            return response.json()
+            return orjson.loads(response.content)
         else:
-            print(f"Warning: Failed to save wellbeing data. Status: {response.status_code}, Response: {response.text}")
+            logger.warning("Failed to save combined results. Status: %s, Response: %s", response.status_code, response.text)
             return None
             
-    except requests.exceptions.RequestException as e:
-        print(f"Warning: Error saving wellbeing data: {str(e)}")
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
+        logger.warning("Error saving combined results: %s", e)
         return None
 
 
+def _json_response(body: Any, status_code: int) -> Response:
+    """Flask JSON response with an orjson-serialized body."""
+    return Response(orjson.dumps(body), status=status_code, mimetype='application/json')
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
+    return _json_response({
         'status': 'healthy',
         'api_base_url': BASE_URL,
         'auth_configured': bool(ADMIN_PASSWORD),
         'deepseek_configured': bool(DEEPSEEK_API_KEY)
-    }), 200
+    }, 200)
 
 
 def process_wellbeing_async(student_id: int, student_info: Dict[str, Any]):
@@ -1077,24 +1567,24 @@ def process_wellbeing_async(student_id: int, student_info: Dict[str, Any]):
     Runs asynchronously after returning student info to the user.
     """
     try:
-        print(f"[Async] Starting wellbeing calculation for student {student_id}")
+        logger.info("[Async] Starting wellbeing calculation for student %s", student_id)
         
-        # Calculate stress score
+        # Generate wellbeing gist using Deepseek while the stress score
+        # (which makes its own Deepseek call for complaints) is calculated
+        gist_future = deepseek_executor.submit(generate_wellbeing_gist, student_info)
         stress_score = calculate_stress_score(student_info)
-        
-        # Generate wellbeing gist using Deepseek
-        wellbeing_gist = generate_wellbeing_gist(student_info)
+        wellbeing_gist = gist_future.result()
         
         # Submit wellbeing data to Spring Boot backend
         wellbeing_response = save_wellbeing_data(student_id, stress_score, wellbeing_gist)
         
         if wellbeing_response:
-            print(f"[Async] Successfully saved wellbeing data for student {student_id}")
+            logger.info("[Async] Successfully saved wellbeing data for student %s", student_id)
         else:
-            print(f"[Async] Failed to save wellbeing data for student {student_id}")
+            logger.warning("[Async] Failed to save wellbeing data for student %s", student_id)
             
     except Exception as e:
-        print(f"[Async] Error processing wellbeing for student {student_id}: {str(e)}")
+        logger.error("[Async] Error processing wellbeing for student %s: %s", student_id, e)
 
 
 def process_guidance_async(student_id: int, student_info: Dict[str, Any]):
@@ -1103,7 +1593,7 @@ def process_guidance_async(student_id: int, student_info: Dict[str, Any]):
     Runs asynchronously after returning student info to the user.
     """
     try:
-        print(f"[Async] Starting guidance generation for student {student_id}")
+        logger.info("[Async] Starting guidance generation for student %s", student_id)
         
         # Generate personalized guidances
         guidances = generate_personalized_habits(student_info)
@@ -1113,14 +1603,92 @@ def process_guidance_async(student_id: int, student_info: Dict[str, Any]):
             guidance_response = save_guidances(student_id, guidances)
             
             if guidance_response:
-                print(f"[Async] Successfully saved guidances for student {student_id}")
+                logger.info("[Async] Successfully saved guidances for student %s", student_id)
             else:
-                print(f"[Async] Failed to save guidances for student {student_id}")
+                logger.warning("[Async] Failed to save guidances for student %s", student_id)
         else:
-            print(f"[Async] No guidances generated for student {student_id}")
+            logger.info("[Async] No guidances generated for student %s", student_id)
             
     except Exception as e:
-        print(f"[Async] Error processing guidance for student {student_id}: {str(e)}")
+        logger.error("[Async] Error processing guidance for student %s: %s", student_id, e)
+
+
+def process_all_async(student_id: int, student_info: Dict[str, Any]):
+    """
+    Background task used when USE_COMBINED_RESULTS is enabled: generates the
+    wellbeing data and guidances in parallel, then submits both in one call.
+    """
+    try:
+        logger.info("[Async] Starting combined processing for student %s", student_id)
+        
+        # Both Deepseek generations run while the stress score is calculated
+        gist_future = deepseek_executor.submit(generate_wellbeing_gist, student_info)
+        guidances_future = deepseek_executor.submit(generate_personalized_habits, student_info)
+        stress_score = calculate_stress_score(student_info)
+        wellbeing_gist = gist_future.result()
+        guidances = guidances_future.result()
+        
+        # Submit everything to Spring Boot backend in one request
+        results_response = save_combined_results(student_id, stress_score, wellbeing_gist, guidances)
+        
+        if results_response:
+            logger.info("[Async] Successfully saved combined results for student %s", student_id)
+        else:
+            logger.warning("[Async] Failed to save combined results for student %s", student_id)
+            
+    except Exception as e:
+        logger.error("[Async] Error processing combined results for student %s: %s", student_id, e)
+
+
+def _claim_student(student_id: int) -> Optional[float]:
+    """
+    Mark a student's background processing as in flight and return the claim time.
+    Returns None instead if the student already has a claim younger than INFLIGHT_TTL
+    seconds, i.e. its earlier tasks are still running.
+    """
+    now = time.monotonic()
+    with _inflight_lock:
+        claimed_at = _inflight_students.get(student_id)
+        if claimed_at is not None and now - claimed_at < INFLIGHT_TTL:
+            return None
+        _inflight_students[student_id] = now
+        return now
+
+
+def _release_student_when_done(student_id: int, claimed_at: float, futures: List[Any]):
+    """Clear the student's in-flight claim once all of its background tasks have finished."""
+    remaining = len(futures)
+    
+    def task_done(_future):
+        nonlocal remaining
+        with _inflight_lock:
+            remaining -= 1
+            # A claim re-taken after INFLIGHT_TTL belongs to newer tasks; leave it alone
+            if remaining == 0 and _inflight_students.get(student_id) == claimed_at:
+                del _inflight_students[student_id]
+    
+    for future in futures:
+        future.add_done_callback(task_done)
+
+
+def _submit_student_tasks(student_id: int, student_info: Dict[str, Any]) -> bool:
+    """
+    Submit the background tasks for a student. Returns False without submitting if
+    this student's tasks are already running (front-end retries, parallel tabs).
+    """
+    claimed_at = _claim_student(student_id)
+    if claimed_at is None:
+        return False
+    
+    if USE_COMBINED_RESULTS:
+        futures = [executor.submit(process_all_async, student_id, student_info)]
+    else:
+        futures = [
+            executor.submit(process_wellbeing_async, student_id, student_info),
+            executor.submit(process_guidance_async, student_id, student_info)
+        ]
+    _release_student_when_done(student_id, claimed_at, futures)
+    return True
 
 
 @app.route('/student-mentor/<int:student_id>', methods=['GET'])
@@ -1132,26 +1700,76 @@ def process_student(student_id):
     1. Calculate stress percentage & wellbeing gist, then submit to POST /wellbeing/{studentId}
     2. Generate personalized guidances, then submit to POST /guidance/{studentId}
     
+    With USE_COMBINED_RESULTS enabled, a single task does both and submits them
+    together to POST /student-mentor/{studentId}/results.
+    
+    Student info is served from a short-lived cache; pass ?fresh=1 to force a
+    new fetch from the backend.
+    
     Returns nothing (void) - processing happens in the background.
     """
     # Step 1: Fetch student info from Spring Boot backend
-    student_info, error, status_code = get_student_info(student_id)
+    fresh = request.args.get('fresh', '').lower() in ('1', 'true')
+    student_info, error, status_code = get_student_info(student_id, fresh=fresh)
     
     if error:
-        return jsonify({
+        return _json_response({
             'error': error
-        }), status_code
+        }, status_code)
     
     # Step 2: Trigger async background tasks for wellbeing and guidance processing
     # These run in parallel and don't block the response
-    executor.submit(process_wellbeing_async, student_id, student_info)
-    executor.submit(process_guidance_async, student_id, student_info)
+    if not _submit_student_tasks(student_id, student_info):
+        logger.debug("Student %s already being processed, not resubmitting", student_id)
     
     # Return 202 Accepted - processing will happen asynchronously
     return '', 202
 
 
+@app.route('/student-mentor/batch', methods=['POST'])
+def process_students_batch():
+    """
+    Batch entry point: same processing as GET /student-mentor/{studentId} for
+    every id in the JSON body {"studentIds": [1, 2, 3]}.
+    
+    Student info for all ids is fetched concurrently, then each student's
+    background tasks are submitted. Returns 202 with a per-id status map:
+    "accepted", "already_processing", or {"error": ..., "status": ...}.
+    """
+    try:
+        body = orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return _json_response({'error': 'Request body must be JSON'}, 400)
+    
+    student_ids = body.get('studentIds') if isinstance(body, dict) else None
+    if not isinstance(student_ids, list) or not all(
+        isinstance(student_id, int) and not isinstance(student_id, bool) for student_id in student_ids
+    ):
+        return _json_response({'error': 'studentIds must be a list of integer ids'}, 400)
+    
+    student_ids = list(dict.fromkeys(student_ids))  # Drop duplicates, keep order
+    if not student_ids or len(student_ids) > BATCH_MAX_STUDENTS:
+        return _json_response({'error': f'studentIds must contain 1-{BATCH_MAX_STUDENTS} ids'}, 400)
+    
+    # Step 1: Fetch all students from Spring Boot backend in parallel
+    fresh = request.args.get('fresh', '').lower() in ('1', 'true')
+    fetches = batch_fetch_executor.map(lambda student_id: get_student_info(student_id, fresh=fresh), student_ids)
+    
+    # Step 2: Trigger the background tasks of every student that was fetched
+    results = {}
+    for student_id, (student_info, error, status_code) in zip(student_ids, fetches):
+        if error:
+            results[str(student_id)] = {'error': error, 'status': status_code}
+        elif _submit_student_tasks(student_id, student_info):
+            results[str(student_id)] = 'accepted'
+        else:
+            results[str(student_id)] = 'already_processing'
+    
+    return _json_response({'results': results}, 202)
+
+
 if __name__ == '__main__':
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     app.run(host='0.0.0.0', port=port, debug=debug)
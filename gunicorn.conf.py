@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration for the Student Mentor AI service.
+
+Run with: gunicorn -c gunicorn.conf.py app:app
+
+Request handling is I/O-bound (Spring Boot and Deepseek round trips), so each
+worker process uses a thread pool (gthread) to serve concurrent requests
+instead of the default one-request-at-a-time sync worker.
+
+Set GUNICORN_WORKER_CLASS=gevent (requires `pip install gevent`) to serve
+requests from greenlets instead; gunicorn's gevent worker monkey-patches the
+standard library before loading the app, so outbound `requests` calls yield
+instead of blocking a thread.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Each worker is a separate process with its own JWT token, caches and background executor
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', '8'))  # gthread only
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '500'))  # gevent only
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+keepalive = 5